@@ -1,11 +1,17 @@
 #!/usr/bin/env python3
-import json
+import asyncio
 import logging
+import multiprocessing
 import os
-import time
-from typing import Optional
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+import orjson
+from playwright.async_api import Browser, Route, async_playwright, TimeoutError as PlaywrightTimeoutError
 
 from src.scrapers import PokemonDetailScraper
+from src.scrapers.pokemon_detail_scraper import STATS_SELECTOR, TITLE_SELECTOR, parse_detail_html
+from src.utils import BLOCKED_RESOURCE_TYPES, save_html
 
 logger = logging.getLogger("pokebase.detail.main")
 logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
@@ -35,93 +41,194 @@ def ensure_dir(path: str):
 
 
 # -------------------------------------------------
-# MAIN SCRAPER LOGIC
+# ASYNC FETCH (1 browser dùng chung cho toàn bộ URL)
 # -------------------------------------------------
 
-def main(list_file: Optional[str] = None, headless: bool = True):
-    # auto-detect input file
-    json_dir = path_json_folder()
-    list_file = list_file or "pokemon_list.json"
-    list_path = os.path.join(json_dir, list_file)
+async def _block_heavy_resources(route: Route):
+    """Bỏ qua image/font/media/css — scraper không dùng tới."""
+    if route.request.resource_type in BLOCKED_RESOURCE_TYPES:
+        await route.abort()
+    else:
+        await route.continue_()
 
-    if not os.path.exists(list_path):
-        logger.error("❌ List file not found: %s", list_path)
-        return
 
-    logger.info("📥 Loading Pokémon list from %s", list_path)
-    with open(list_path, "r", encoding="utf-8") as f:
-        data = json.load(f)
+async def _fetch_page(browser: Browser, scraper: PokemonDetailScraper) -> Optional[str]:
+    """Mở 1 page mới trên browser dùng chung, trả về HTML hoặc None."""
+    for attempt in range(1, scraper.retries + 1):
+        if attempt > 1:
+            await asyncio.sleep(1)  # backoff ngắn giữa các lần thử, như bản sync
 
-    items = data.get("results", [])
+        page = await browser.new_page(user_agent=scraper.user_agent)
+        await page.route("**/*", _block_heavy_resources)
+        try:
+            await page.goto(scraper.url, timeout=scraper.pw_timeout, wait_until="domcontentloaded")
+            try:
+                await page.wait_for_selector(TITLE_SELECTOR, timeout=8000)
+            except PlaywrightTimeoutError:
+                logger.warning("h1 not found (%s), retrying… %d/%d", scraper.url, attempt, scraper.retries)
+                continue
 
-    # output directory
-    out_dir = path_detail_output()
-    ensure_dir(out_dir)
-    logger.info("📁 Output detail folder: %s", out_dir)
+            # Đợi JS render components (base stats) thay vì sleep cố định
+            try:
+                await page.wait_for_selector(STATS_SELECTOR, state="attached", timeout=5000)
+            except PlaywrightTimeoutError:
+                logger.warning("base stats not rendered (%s), continue anyway", scraper.url)
 
-    total = len(items)
-    logger.info("🔎 Found %d Pokémon to process", total)
+            # h1 đã có (wait_for_selector ở trên) → HTML dùng được
+            return await page.content()
+        except Exception as e:
+            logger.error("Playwright error (%s) %d/%d: %s", scraper.url, attempt, scraper.retries, e)
+        finally:
+            await page.close()
 
-    scraper_settings = {
-        "headless": headless,
-        "retries": 2,
-        "pw_timeout": 60000,
-        "wait_after_idle": 1.0,
-    }
+    return None
+
+
+async def fetch_all(
+        items: List[Dict[str, Any]],
+        out_dir: str,
+        settings: Dict[str, Any],
+        max_concurrency: int = 8,
+) -> Tuple[int, int]:
+    """Fetch + parse toàn bộ Pokémon detail song song, trả về (success, failed)."""
+    total = len(items)
+    sem = asyncio.Semaphore(max_concurrency)
 
+    # list output dir 1 lần thay vì os.path.exists từng item
+    with os.scandir(out_dir) as entries:
+        existing = {e.name for e in entries if e.name.endswith(".json")}
     success = 0
     failed = 0
 
-    for idx, item in enumerate(items, start=1):
+    async def process(idx: int, item: Dict[str, Any], browser: Browser):
+        nonlocal success, failed
+
         url = item.get("url")
         if not url:
             logger.warning("[%d/%d] ⚠ Skipped — missing URL", idx, total)
             failed += 1
-            continue
+            return
 
         slug = url.rstrip("/").split("/")[-1]
         out_file = os.path.join(out_dir, f"{slug}.json")
 
         # skip nếu đã tồn tại
-        if os.path.exists(out_file):
+        if f"{slug}.json" in existing:
             logger.info("[%d/%d] ⏭ Skip: %s (exists)", idx, total, slug)
-            continue
+            return
+
+        async with sem:
+            logger.info("[%d/%d] ▶ Fetching: %s", idx, total, url)
+
+            try:
+                scraper = PokemonDetailScraper(
+                    url=url,
+                    file_name=slug,
+                    scraper_settings=settings,
+                )
+
+                # HTML còn hạn trong cache → parse lại, không cần Playwright
+                # (diskcache = SQLite + file lock → chạy ở thread, không chặn event loop;
+                # cache tắt thì load/store là no-op)
+                html = await asyncio.to_thread(scraper.load_cached_html)
+                from_cache = html is not None
+                if from_cache:
+                    logger.info("[%d/%d] 💾 Cached HTML: %s", idx, total, slug)
+                else:
+                    html = await _fetch_page(browser, scraper)
+
+                if not html:
+                    logger.error("[%d/%d] ❌ Failed fetch: %s", idx, total, slug)
+                    failed += 1
+                    return
+
+                if not from_cache:
+                    await asyncio.to_thread(scraper.store_cached_html, html)
+                    if scraper.save_raw_html:
+                        await asyncio.to_thread(save_html, html, scraper.raw_html_path)
+
+                # parse là CPU-bound → chạy ở process pool, event loop tiếp tục fetch
+                detail = await loop.run_in_executor(process_pool, parse_detail_html, html)
+
+                # combine original list meta + detail
+                output_json = {
+                    "list_meta": item,
+                    "detail": detail
+                }
+
+                with open(out_file, "wb") as f:
+                    f.write(orjson.dumps(output_json, option=orjson.OPT_INDENT_2))
+
+                logger.info("[%d/%d] ✅ Saved: %s", idx, total, out_file)
+                success += 1
+
+            except Exception as e:
+                logger.exception("❌ Error processing %s: %s", slug, e)
+                failed += 1
 
-        logger.info("[%d/%d] ▶ Fetching: %s", idx, total, url)
+    loop = asyncio.get_running_loop()
 
-        try:
-            scraper = PokemonDetailScraper(
-                url=url,
-                file_name=slug,
-                scraper_settings=scraper_settings,
-            )
+    # "spawn": worker khởi động lazily ở lần submit đầu, lúc đó process đã có event loop
+    # + thread/pipe của Playwright driver → fork lúc ấy dễ deadlock
+    with ProcessPoolExecutor(
+            max_workers=os.cpu_count(), mp_context=multiprocessing.get_context("spawn")
+    ) as process_pool:
+        async with async_playwright() as p:
+            browser = await p.chromium.launch(headless=settings.get("headless", True))
+            try:
+                await asyncio.gather(
+                    *(process(idx, item, browser) for idx, item in enumerate(items, start=1))
+                )
+            finally:
+                await browser.close()
 
-            soup = scraper.fetch() if hasattr(scraper, "fetch") else scraper._fetch_html()
+    return success, failed
 
-            if not soup:
-                logger.error("[%d/%d] ❌ Failed fetch: %s", idx, total, slug)
-                failed += 1
-                continue
 
-            detail = scraper.parse(soup)
+# -------------------------------------------------
+# MAIN SCRAPER LOGIC
+# -------------------------------------------------
 
-            # combine original list meta + detail
-            output_json = {
-                "list_meta": item,
-                "detail": detail
-            }
+def main(
+        list_file: Optional[str] = None,
+        headless: bool = True,
+        max_concurrency: int = 8,
+        http_cache: bool = False,
+):
+    # auto-detect input file
+    json_dir = path_json_folder()
+    list_file = list_file or "pokemon_list.json"
+    list_path = os.path.join(json_dir, list_file)
 
-            with open(out_file, "w", encoding="utf-8") as f:
-                json.dump(output_json, f, ensure_ascii=False, indent=2)
+    if not os.path.exists(list_path):
+        logger.error("❌ List file not found: %s", list_path)
+        return
 
-            logger.info("[%d/%d] ✅ Saved: %s", idx, total, out_file)
-            success += 1
+    logger.info("📥 Loading Pokémon list from %s", list_path)
+    with open(list_path, "rb") as f:
+        data = orjson.loads(f.read())
 
-        except Exception as e:
-            logger.exception("❌ Error processing %s: %s", slug, e)
-            failed += 1
+    items = data.get("results", [])
+
+    # output directory
+    out_dir = path_detail_output()
+    ensure_dir(out_dir)
+    logger.info("📁 Output detail folder: %s", out_dir)
+
+    total = len(items)
+    logger.info("🔎 Found %d Pokémon to process (concurrency=%d)", total, max_concurrency)
+
+    scraper_settings = {
+        "headless": headless,
+        "retries": 2,
+        "pw_timeout": 60000,
+        # cache HTML detail page trên disk: opt-in, base scraper tự tắt trong CI
+        "http_cache": http_cache,
+    }
 
-        time.sleep(0.5)
+    success, failed = asyncio.run(
+        fetch_all(items, out_dir, scraper_settings, max_concurrency=max_concurrency)
+    )
 
     logger.info("🎉 Done! success=%d failed=%d total=%d", success, failed, total)
 
@@ -2,7 +2,7 @@ import json
 import os
 import time
 from abc import ABC, abstractmethod
-from typing import Any, Optional
+from typing import Any, Generic, Optional, TypeVar, cast
 
 import requests
 from bs4 import BeautifulSoup
@@ -10,7 +10,11 @@ from bs4 import BeautifulSoup
 from src.utils import save_html
 
 
-class BaseScraper(ABC):
+# Document produced by _fetch_html and consumed by parse (BeautifulSoup, selectolax tree, list of HTML...)
+DocT = TypeVar("DocT")
+
+
+class BaseScraper(ABC, Generic[DocT]):
     def __init__(self, url: str, file_name: str, scraper_settings: dict[str, Any]):
         # Always resolve actual repo root
         root_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -20,8 +24,14 @@ class BaseScraper(ABC):
         # Save JSON inside repo/json/
         self.json_path = os.path.join(root_dir, "json", f"{file_name}.json")
         self.scraper_settings = scraper_settings
+        # Raw HTML is only for debugging, so it is not written to disk by default
+        self.save_raw_html = scraper_settings.get("save_raw_html", False)
+        # On-disk HTTP cache (diskcache) is opt-in and never used in CI,
+        # where the cache dir is thrown away after every job
+        self.use_http_cache = scraper_settings.get("http_cache", False) and not os.getenv("CI")
 
-    def _fetch_html(self) -> Optional[BeautifulSoup]:
+    def _fetch_html(self) -> Optional[DocT]:
+        """Default fetch: requests + BeautifulSoup. Scrapers using another document type override this."""
         retries = self.scraper_settings.get("retries", 3)
         delay = self.scraper_settings.get("delay", 5)
         timeout = self.scraper_settings.get("timeout", 15)
@@ -32,9 +42,10 @@ class BaseScraper(ABC):
                 response = requests.get(self.url, timeout=timeout)
                 response.raise_for_status()
 
-                save_html(response.text, self.raw_html_path)
+                if self.save_raw_html:
+                    save_html(response.text, self.raw_html_path)
 
-                return BeautifulSoup(response.content, "lxml")
+                return cast(DocT, BeautifulSoup(response.content, "lxml"))
             except requests.exceptions.RequestException as e:
                 print(f"Error fetching {self.url}: {e}", flush=True)
                 if attempt < retries - 1:
@@ -56,13 +67,13 @@ class BaseScraper(ABC):
         print(f"Successfully saved {self.json_path}")
 
     @abstractmethod
-    def parse(self, soup: BeautifulSoup) -> dict[Any, Any] | list[Any]:
+    def parse(self, document: DocT) -> dict[Any, Any] | list[Any]:
         pass
 
     def run(self):
-        soup = self._fetch_html()
-        if soup:
-            data = self.parse(soup)
+        document = self._fetch_html()
+        if document:
+            data = self.parse(document)
             self.save_to_json(data)
         else:
             self.save_to_json({})
\ No newline at end of file
@@ -17,7 +17,7 @@ def convert_egg_json(old_json: dict) -> dict:
 
     return {"results": result}
 
-class EggScraper(BaseScraper):
+class EggScraper(BaseScraper[BeautifulSoup]):
     def __init__(self, url: str, file_name: str, scraper_settings: dict[str, Any]):
         super().__init__(url, file_name, scraper_settings)
 
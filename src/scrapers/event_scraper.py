@@ -35,7 +35,7 @@ def convert_events_json(old_json: dict) -> dict:
 
     return { "results": result }
 
-class EventScraper(BaseScraper):
+class EventScraper(BaseScraper[BeautifulSoup]):
     def __init__(
         self,
         url: str,
@@ -0,0 +1,63 @@
+import hashlib
+import logging
+import os
+from typing import Any, Callable, Optional, TypeVar
+
+from diskcache import Cache
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# src/json/.http_cache — dùng chung cho mọi scraper
+CACHE_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "json", ".http_cache"
+)
+
+_cache: Optional[Cache] = None
+
+
+def get_cache() -> Cache:
+    """Mở diskcache 1 lần / process (SQLite, an toàn giữa thread + process)."""
+    global _cache
+    if _cache is None:
+        _cache = Cache(CACHE_DIR)
+    return _cache
+
+
+def cache_key(url: str, user_agent: str = "") -> str:
+    """Key = URL + hash user agent (cùng URL, UA khác có thể trả HTML khác)."""
+    ua_hash = hashlib.sha1(user_agent.encode("utf-8")).hexdigest()[:12]
+    return f"{url}|{ua_hash}"
+
+
+def get_cached(url: str, user_agent: str = "") -> Any:
+    """Trả về giá trị đã cache cho URL, hoặc None nếu chưa có / đã hết hạn."""
+    return get_cache().get(cache_key(url, user_agent))
+
+
+def set_cached(url: str, value: Any, ttl: float, user_agent: str = ""):
+    get_cache().set(cache_key(url, user_agent), value, expire=ttl)
+
+
+def get_or_fetch(
+        url: str,
+        ttl: float,
+        fetcher: Callable[[], Optional[T]],
+        user_agent: str = "",
+        should_cache: Callable[[T], bool] = bool,
+) -> Optional[T]:
+    """Lấy từ cache nếu còn hạn, ngược lại gọi fetcher() và cache kết quả.
+
+    Chỉ cache khi ``should_cache(value)`` đúng (mặc định: value truthy), để kết quả
+    thiếu / lỗi không bị phục vụ lại suốt TTL.
+    """
+    cached = get_cached(url, user_agent)
+    if cached is not None:
+        logger.info(f"[HttpCache] Hit: {url}")
+        return cached
+
+    value = fetcher()
+    if value and should_cache(value):
+        set_cached(url, value, ttl, user_agent)
+    return value
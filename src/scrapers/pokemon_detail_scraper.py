@@ -2,14 +2,44 @@ import logging
 import time
 from typing import Any, Dict, Optional
 
-from bs4 import BeautifulSoup
 from playwright.sync_api import sync_playwright, TimeoutError as PlaywrightTimeoutError
+from selectolax.lexbor import LexborHTMLParser as HTMLParser, LexborNode as Node
 
+from src.scrapers import http_cache
 from src.scrapers.base_scraper import BaseScraper
-from src.utils import save_html
+from src.utils import block_heavy_resources, save_html
 
 logger = logging.getLogger(__name__)
 
+# Title của page; thiếu h1 = page chưa render / bị chặn → retry
+TITLE_SELECTOR = "h1.font-logo"
+
+# Base stats chỉ xuất hiện sau khi JS render → dùng làm tín hiệu "page đã render xong"
+STATS_SELECTOR = "div.grid.grid-cols-3 span.font-medium"
+
+# (prefix của tên, variant) — thứ tự check giống chuỗi if/elif cũ
+_VARIANT_PREFIXES = (
+    ("mega ", "mega"),
+    ("gigantamax ", "gmax"),
+    ("dynamax ", "dmax"),
+    ("shadow ", "shadow"),
+)
+
+# Thứ tự cột CP trên page
+_CP_KEYS = ("lvl50", "lvl40", "lvl25", "lvl20", "lvl15")
+
+# (result key, label của span) cho các section type effectiveness
+_TYPE_EFFECT_SECTIONS = (
+    ("weak_to", "Weak to"),
+    ("resistant_to", "Resistant to"),
+)
+
+# (result key, label của h2) cho các section move có damage
+_DAMAGE_MOVE_SECTIONS = (
+    ("fast_moves", "Fast"),
+    ("charge_moves", "Charge"),
+)
+
 
 def clean_img(url: Optional[str]) -> Optional[str]:
     if not url:
@@ -17,7 +47,198 @@ def clean_img(url: Optional[str]) -> Optional[str]:
     return url.split("?", 1)[0]
 
 
-class PokemonDetailScraper(BaseScraper):
+def _find_next(node: Node, tag: str) -> Optional[Node]:
+    """Tương đương BS4 ``find_next(tag)``: element ``tag`` kế tiếp theo thứ tự document."""
+    cur: Optional[Node] = node
+    while cur is not None:
+        sib = cur.next
+        while sib is not None:
+            if sib.tag == tag:
+                return sib
+            if not sib.tag.startswith("-"):
+                found = sib.css_first(tag)
+                if found is not None:
+                    return found
+            sib = sib.next
+        cur = cur.parent
+    return None
+
+
+def _bs4_string(node: Node) -> Optional[str]:
+    """Tương đương BS4 ``tag.string``: chỉ khi node có đúng 1 child.
+
+    Child là text/comment → trả text đó; child là element → đệ quy vào nó;
+    0 hoặc nhiều child (kể cả text khoảng trắng) → None.
+    """
+    while True:
+        child = node.child
+        if child is None or child.next is not None:
+            return None
+        if child.tag == "-text":
+            return child.text_content
+        if child.tag == "-comment":
+            return child.html[4:-3]  # bỏ "<!--" và "-->"
+        node = child
+
+
+def _find_by_text(index: Dict[str, Node], needle: str) -> Optional[Node]:
+    """Lookup node đầu tiên có text chứa ``needle`` trong index {text: node}."""
+    for text, node in index.items():
+        if needle in text:
+            return node
+    return None
+
+
+# -------------------------------------------------
+# PARSE (Unified for all Pokémon variants)
+# -------------------------------------------------
+def parse_detail_tree(tree: HTMLParser) -> Dict[str, Any]:
+    """Parse detail page (normal / mega / shadow / gmax / dmax) thành dict."""
+    result: Dict[str, Any] = {}
+
+    # Index span/h2 theo .string (như BS4) 1 lần, thay cho find(string=lambda) quét cả cây
+    span_by_text: Dict[str, Node] = {}
+    for span in tree.css("span"):
+        text = _bs4_string(span)
+        if text:
+            span_by_text.setdefault(text, span)
+
+    h2_by_text: Dict[str, Node] = {}
+    for h2 in tree.css("h2"):
+        text = _bs4_string(h2)
+        if text:
+            h2_by_text.setdefault(text, h2)
+
+    # -------------------------------------------------
+    # BASIC INFO
+    # -------------------------------------------------
+    h1 = tree.css_first(TITLE_SELECTOR)
+    name = h1.text(strip=True) if h1 else ""
+    result["name"] = name
+
+    # Variant detection
+    nl = name.lower()
+    result["variant"] = next((v for prefix, v in _VARIANT_PREFIXES if nl.startswith(prefix)), "normal")
+
+    # Dex
+    dex_el = tree.css_first("div.top-3.right-3 span")
+    result["dex"] = dex_el.text(strip=True).replace("#", "") if dex_el else None
+
+    # Main image
+    img_el = tree.css_first("div.h-60 img")
+    result["image"] = clean_img(img_el.attributes.get("src")) if img_el else None
+
+    # Sprites
+    result["sprites"] = {
+        "default": result["image"],
+        "go": None,
+        "go_shiny": None,
+        "shuffle": None,
+    }
+
+    sprite_imgs = tree.css("div.flex.gap-2 img")
+    for img in sprite_imgs:
+        alt = (img.attributes.get("alt") or "").lower()
+        src = clean_img(img.attributes.get("src"))
+        if "shiny" in alt:
+            result["sprites"]["go_shiny"] = src
+        elif alt == "go":
+            result["sprites"]["go"] = src
+        elif "shuffle" in alt:
+            result["sprites"]["shuffle"] = src
+
+    # -------------------------------------------------
+    # TYPES
+    # -------------------------------------------------
+    type_icons = tree.css("div.top-3.left-3 img")
+    result["types"] = [t.attributes.get("alt") for t in type_icons]
+
+    # -------------------------------------------------
+    # BASE STATS
+    # -------------------------------------------------
+    stats = tree.css(STATS_SELECTOR)
+    base = {"attack": None, "defense": None, "stamina": None}
+    if len(stats) == 3:
+        base["attack"] = stats[0].text(strip=True)
+        base["defense"] = stats[1].text(strip=True)
+        base["stamina"] = stats[2].text(strip=True)
+    result["base_stats"] = base
+
+    # -------------------------------------------------
+    # CP TABLE
+    # -------------------------------------------------
+    cp_els = tree.css(".font-mono.tabular-nums.font-semibold.text-sm")
+    cp = dict.fromkeys(_CP_KEYS)
+
+    for lv, el in zip(_CP_KEYS, cp_els):
+        cp[lv] = el.text(strip=True)
+    result["cp"] = cp
+
+    # -------------------------------------------------
+    # WEAK TO / RESISTANT TO
+    # -------------------------------------------------
+    for key, label in _TYPE_EFFECT_SECTIONS:
+        result[key] = []
+        span = _find_by_text(span_by_text, label)
+        if span and span.parent:
+            for a in span.parent.css("a.flex"):
+                spans = a.css("span")
+                if len(spans) >= 2:
+                    result[key].append({
+                        "type": spans[0].text(strip=True),
+                        "multiplier": spans[-1].text(strip=True),
+                    })
+
+    # -------------------------------------------------
+    # FAST / CHARGE MOVES
+    # -------------------------------------------------
+    for key, label in _DAMAGE_MOVE_SECTIONS:
+        result[key] = []
+        h2 = _find_by_text(h2_by_text, label)
+        moves_div = _find_next(h2, "div") if h2 else None
+        if moves_div:
+            for a in moves_div.css("a"):
+                nm = a.css_first("span.flex-grow") or a.css_first("span")
+                dmg = a.css("button")[-1]
+                result[key].append({
+                    "name": nm.text(strip=True) if nm else None,
+                    "damage": dmg.text(strip=True),
+                })
+
+    # -------------------------------------------------
+    # DYNAMAX MOVES
+    # -------------------------------------------------
+    result["dynamax_moves"] = []
+    dyn_h2 = _find_by_text(h2_by_text, "Dynamax")
+    dyn_div = _find_next(dyn_h2, "div") if dyn_h2 else None
+    if dyn_div:
+        for a in dyn_div.css("a"):
+            nm = a.css_first("div.text-sm")
+            if nm:
+                result["dynamax_moves"].append(nm.text(strip=True))
+
+    # -------------------------------------------------
+    # EVOLUTION TREE
+    # -------------------------------------------------
+    result["evolution_tree"] = []
+    evos = tree.css("div.flex.flex-col.gap-2 a")
+    for a in evos:
+        img = a.css_first("img")
+        nm = a.css_first("span.font-semibold")
+        result["evolution_tree"].append({
+            "name": nm.text(strip=True) if nm else None,
+            "image": clean_img(img.attributes.get("src")) if img else None,
+        })
+
+    return result
+
+
+def parse_detail_html(html: str) -> Dict[str, Any]:
+    """Module-level (picklable) để chạy được trong ProcessPoolExecutor."""
+    return parse_detail_tree(HTMLParser(html))
+
+
+class PokemonDetailScraper(BaseScraper[HTMLParser]):
     """Unified scraper cho Pokémon detail:
     normal / mega / shadow / gmax / dmax
     """
@@ -33,12 +254,34 @@ class PokemonDetailScraper(BaseScraper):
         )
         self.pw_timeout = scraper_settings.get("pw_timeout", 60000)
         self.retries = scraper_settings.get("retries", 2)
-        self.wait_after_idle = scraper_settings.get("wait_after_idle", 1.0)
+        self.cache_ttl_s = scraper_settings.get("cache_ttl_s", 7 * 24 * 3600)
+
+    # -------------------------------------------------
+    # HTML CACHE (diskcache dùng chung, key = URL + user agent)
+    # -------------------------------------------------
+    def load_cached_html(self) -> Optional[str]:
+        """Trả về HTML đã cache cho URL nếu còn trong cache_ttl_s, ngược lại None."""
+        if not self.use_http_cache:
+            return None
+        return http_cache.get_cached(self.url, self.user_agent)
+
+    def store_cached_html(self, html: str):
+        if self.use_http_cache:
+            http_cache.set_cached(self.url, html, self.cache_ttl_s, self.user_agent)
 
     # -------------------------------------------------
-    # FETCH HTML (Playwright) – patched version
+    # FETCH HTML (cache → Playwright)
     # -------------------------------------------------
-    def _fetch_html(self) -> Optional[BeautifulSoup]:
+    def _fetch_html(self) -> Optional[HTMLParser]:
+        if not self.use_http_cache:
+            html = self._playwright_get()
+        else:
+            html = http_cache.get_or_fetch(
+                self.url, self.cache_ttl_s, self._playwright_get, user_agent=self.user_agent
+            )
+        return HTMLParser(html) if html else None
+
+    def _playwright_get(self) -> Optional[str]:
         """Playwright fetch ổn định: domcontentloaded + wait_for_selector."""
 
         for attempt in range(1, self.retries + 1):
@@ -49,6 +292,7 @@ class PokemonDetailScraper(BaseScraper):
                     browser = p.chromium.launch(headless=self.headless)
                     ctx = browser.new_context(user_agent=self.user_agent)
                     page = ctx.new_page()
+                    page.route("**/*", block_heavy_resources)
 
                     logger.info(f"[PokebaseDetail] Loading URL: {self.url}")
                     page.goto(self.url, timeout=self.pw_timeout)
@@ -57,13 +301,18 @@ class PokemonDetailScraper(BaseScraper):
                     page.wait_for_load_state("domcontentloaded")
 
                     # 2. Đợi element quan trọng xuất hiện (tránh blank render)
+                    fetch_ok = True
                     try:
-                        page.wait_for_selector("h1.font-logo", timeout=8000)
+                        page.wait_for_selector(TITLE_SELECTOR, timeout=8000)
                     except PlaywrightTimeoutError:
-                        logger.warning("[PokebaseDetail] h1 not found, continue anyway")
+                        fetch_ok = False
 
-                    # 3. Grace time cho JS render components
-                    time.sleep(self.wait_after_idle)
+                    # 3. Đợi JS render components (base stats) thay vì sleep cố định
+                    if fetch_ok:
+                        try:
+                            page.wait_for_selector(STATS_SELECTOR, state="attached", timeout=5000)
+                        except PlaywrightTimeoutError:
+                            logger.warning("[PokebaseDetail] base stats not rendered, continue anyway")
 
                     html = page.content()
 
@@ -71,12 +320,14 @@ class PokemonDetailScraper(BaseScraper):
                     ctx.close()
                     browser.close()
 
-                if not html or len(html) < 200:
-                    logger.warning("[PokebaseDetail] Empty HTML, retrying…")
+                if not fetch_ok:
+                    logger.warning("[PokebaseDetail] h1 not found, retrying…")
+                    time.sleep(1)
                     continue
 
-                save_html(html, self.raw_html_path)
-                return BeautifulSoup(html, "lxml")
+                if self.save_raw_html:
+                    save_html(html, self.raw_html_path)
+                return html
 
             except Exception as e:
                 logger.error(f"[PokebaseDetail] Playwright error: {e}")
@@ -86,166 +337,7 @@ class PokemonDetailScraper(BaseScraper):
         return None
 
     # -------------------------------------------------
-    # PARSE (Unified for all Pokémon variants)
-    # -------------------------------------------------
-    def parse(self, soup: BeautifulSoup) -> Dict[str, Any]:
-        result: Dict[str, Any] = {}
-
-        # -------------------------------------------------
-        # BASIC INFO
-        # -------------------------------------------------
-        h1 = soup.select_one("h1.font-logo")
-        name = h1.get_text(strip=True) if h1 else ""
-        result["name"] = name
-
-        # Variant detection
-        nl = name.lower()
-        if nl.startswith("mega "):
-            variant = "mega"
-        elif nl.startswith("gigantamax "):
-            variant = "gmax"
-        elif nl.startswith("dynamax "):
-            variant = "dmax"
-        elif nl.startswith("shadow "):
-            variant = "shadow"
-        else:
-            variant = "normal"
-
-        result["variant"] = variant
-
-        # Dex
-        dex_el = soup.select_one("div.top-3.right-3 span")
-        result["dex"] = dex_el.get_text(strip=True).replace("#", "") if dex_el else None
-
-        # Main image
-        img_el = soup.select_one("div.h-60 img")
-        result["image"] = clean_img(img_el.get("src")) if img_el else None
-
-        # Sprites
-        result["sprites"] = {
-            "default": result["image"],
-            "go": None,
-            "go_shiny": None,
-            "shuffle": None,
-        }
-
-        sprite_imgs = soup.select("div.flex.gap-2 img")
-        for img in sprite_imgs:
-            alt = (img.get("alt") or "").lower()
-            src = clean_img(img.get("src"))
-            if "shiny" in alt:
-                result["sprites"]["go_shiny"] = src
-            elif alt == "go":
-                result["sprites"]["go"] = src
-            elif "shuffle" in alt:
-                result["sprites"]["shuffle"] = src
-
-        # -------------------------------------------------
-        # TYPES
-        # -------------------------------------------------
-        type_icons = soup.select("div.top-3.left-3 img")
-        result["types"] = [t.get("alt") for t in type_icons]
-
-        # -------------------------------------------------
-        # BASE STATS
-        # -------------------------------------------------
-        stats = soup.select("div.grid.grid-cols-3 span.font-medium")
-        base = {"attack": None, "defense": None, "stamina": None}
-        if len(stats) == 3:
-            base["attack"] = stats[0].get_text(strip=True)
-            base["defense"] = stats[1].get_text(strip=True)
-            base["stamina"] = stats[2].get_text(strip=True)
-        result["base_stats"] = base
-
-        # -------------------------------------------------
-        # CP TABLE
-        # -------------------------------------------------
-        cp_lv = ["lvl50", "lvl40", "lvl25", "lvl20", "lvl15"]
-        cp_els = soup.select(".font-mono.tabular-nums.font-semibold.text-sm")
-        cp = {lv: None for lv in cp_lv}
-
-        for lv, el in zip(cp_lv, cp_els):
-            cp[lv] = el.get_text(strip=True)
-        result["cp"] = cp
-
-        # -------------------------------------------------
-        # WEAK TO
-        # -------------------------------------------------
-        result["weak_to"] = []
-        weak = soup.find("span", string=lambda x: x and "Weak to" in x)
-        if weak:
-            for a in weak.parent.select("a.flex"):
-                spans = a.select("span")
-                if len(spans) >= 2:
-                    result["weak_to"].append({
-                        "type": spans[0].get_text(strip=True),
-                        "multiplier": spans[-1].get_text(strip=True),
-                    })
-
-        # -------------------------------------------------
-        # RESISTANT TO
-        # -------------------------------------------------
-        result["resistant_to"] = []
-        res = soup.find("span", string=lambda x: x and "Resistant to" in x)
-        if res:
-            for a in res.parent.select("a.flex"):
-                spans = a.select("span")
-                if len(spans) >= 2:
-                    result["resistant_to"].append({
-                        "type": spans[0].get_text(strip=True),
-                        "multiplier": spans[-1].get_text(strip=True),
-                    })
-
-        # -------------------------------------------------
-        # FAST MOVES
-        # -------------------------------------------------
-        result["fast_moves"] = []
-        fast_h2 = soup.find("h2", string=lambda x: x and "Fast" in x)
-        if fast_h2:
-            for a in fast_h2.find_next("div").select("a"):
-                nm = a.select_one("span.flex-grow") or a.select_one("span")
-                dmg = a.select("button")[-1]
-                result["fast_moves"].append({
-                    "name": nm.get_text(strip=True) if nm else None,
-                    "damage": dmg.get_text(strip=True),
-                })
-
-        # -------------------------------------------------
-        # CHARGE MOVES
-        # -------------------------------------------------
-        result["charge_moves"] = []
-        charge_h2 = soup.find("h2", string=lambda x: x and "Charge" in x)
-        if charge_h2:
-            for a in charge_h2.find_next("div").select("a"):
-                nm = a.select_one("span.flex-grow") or a.select_one("span")
-                dmg = a.select("button")[-1]
-                result["charge_moves"].append({
-                    "name": nm.get_text(strip=True) if nm else None,
-                    "damage": dmg.get_text(strip=True),
-                })
-
-        # -------------------------------------------------
-        # DYNAMAX MOVES
-        # -------------------------------------------------
-        result["dynamax_moves"] = []
-        dyn_h2 = soup.find("h2", string=lambda x: x and "Dynamax" in x)
-        if dyn_h2:
-            for a in dyn_h2.find_next("div").select("a"):
-                nm = a.select_one("div.text-sm")
-                if nm:
-                    result["dynamax_moves"].append(nm.get_text(strip=True))
-
-        # -------------------------------------------------
-        # EVOLUTION TREE
-        # -------------------------------------------------
-        result["evolution_tree"] = []
-        evos = soup.select("div.flex.flex-col.gap-2 a")
-        for a in evos:
-            img = a.select_one("img")
-            nm = a.select_one("span.font-semibold")
-            result["evolution_tree"].append({
-                "name": nm.get_text(strip=True) if nm else None,
-                "image": clean_img(img.get("src")) if img else None,
-            })
-
-        return result
+    # PARSE
+    # -------------------------------------------------
+    def parse(self, tree: HTMLParser) -> Dict[str, Any]:
+        return parse_detail_tree(tree)
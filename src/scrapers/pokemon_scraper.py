@@ -1,18 +1,23 @@
+import asyncio
 import logging
 import time
 from typing import Any, Dict, List, Optional
 
-from bs4 import BeautifulSoup
+import httpx
 from playwright.sync_api import sync_playwright, TimeoutError as PlaywrightTimeoutError
+from selectolax.lexbor import LexborHTMLParser as HTMLParser
 
+from src.scrapers import http_cache
 from src.scrapers.base_scraper import BaseScraper
-from src.utils import save_html
+from src.utils import block_heavy_resources, save_html
 
 logger = logging.getLogger(__name__)
 
+ROW_SELECTOR = "div.table-row-group > div.table-row"
 
-class PokebaseScraper(BaseScraper):
-    """Scraper lấy dữ liệu Pokémon từ Pokebase bằng Playwright."""
+
+class PokebaseScraper(BaseScraper[List[str]]):
+    """Scraper lấy dữ liệu Pokémon từ Pokebase (HTTP, fallback Playwright)."""
 
     def __init__(self, url: str, file_name: str, scraper_settings: dict[str, Any]):
         super().__init__(url, file_name, scraper_settings)
@@ -25,40 +30,119 @@ class PokebaseScraper(BaseScraper):
         )
         self.pw_timeout = scraper_settings.get("pw_timeout", 60000)
         self.retries = scraper_settings.get("retries", 2)
-        self.wait_after_idle = scraper_settings.get("wait_after_network_idle_s", 1.0)
+        self.row_timeout = scraper_settings.get("row_timeout", 10000)
+        self.http_timeout = scraper_settings.get("timeout", 15)
+        self.cache_ttl_s = scraper_settings.get("cache_expiration_hours", 1) * 3600
+
+    # -------------------------------------------------
+    # Fetch: cache → HTTP → Playwright fallback
+    # -------------------------------------------------
+    def _fetch_html(self) -> Optional[List[str]]:
+        """Fetch toàn bộ pages (qua cache nếu bật), trả về list HTML theo thứ tự page."""
+        if not self.use_http_cache:
+            return self._fetch_pages()
+        return http_cache.get_or_fetch(
+            self.url,
+            self.cache_ttl_s,
+            self._fetch_pages,
+            user_agent=self.user_agent,
+            should_cache=self._all_pages_have_rows,
+        )
+
+    @staticmethod
+    def _all_pages_have_rows(pages: List[str]) -> bool:
+        """Chỉ cache khi mọi page đều có rows (Playwright vẫn trả page khi rows timeout)."""
+        return all(HTMLParser(html).css_first(ROW_SELECTOR) is not None for html in pages)
+
+    def _fetch_pages(self) -> Optional[List[str]]:
+        """HTTP thường trước; nếu rows cần JS render thì fallback Playwright."""
+        try:
+            pages = asyncio.run(self._fetch_http())
+        except Exception as e:
+            # Lỗi gì ở nhánh HTTP (h2/protocol, decode, loop đang chạy...) cũng fallback
+            logger.warning(f"[Pokebase] HTTP fetch error: {e!r}", exc_info=True)
+            pages = None
+
+        if not pages:
+            logger.info("[Pokebase] HTTP không lấy được rows (cần JS / lỗi) → fallback Playwright")
+            pages = self._fetch_playwright()
+
+        if pages and self.save_raw_html:
+            # Save snapshot
+            save_html("\n<!--PAGE_BREAK-->\n".join(pages), self.raw_html_path)
+
+        return pages
 
     # -------------------------------------------------
-    # Fetch + pagination
+    # Plain HTTP (server-rendered rows, không cần browser)
     # -------------------------------------------------
-    def _fetch_html(self) -> Optional[BeautifulSoup]:
-        """Fetch toàn bộ pages bằng Playwright và merge lại thành 1 soup."""
+    async def _fetch_http(self) -> Optional[List[str]]:
+        """Fetch page 1, rồi page 2..N song song trên 1 HTTP/2 connection pool.
+
+        Trả về None nếu HTML không có sẵn rows (tức page cần JS).
+        """
+        async with httpx.AsyncClient(
+            http2=True,
+            limits=httpx.Limits(max_connections=32),
+            headers={"User-Agent": self.user_agent},
+            timeout=self.http_timeout,
+            follow_redirects=True,
+        ) as client:
+            logger.info("[Pokebase] HTTP loading page 1")
+            first = await client.get(self.url)
+            first.raise_for_status()
+
+            tree = HTMLParser(first.text)
+            if not tree.css_first(ROW_SELECTOR):
+                return None
+
+            max_page = self._detect_total_pages(tree)
+            logger.info(f"[Pokebase] Detected total pages = {max_page}")
+
+            responses = await asyncio.gather(
+                *(client.get(f"{self.url}?page={i}") for i in range(2, max_page + 1))
+            )
+
+            pages = [first.text]
+            for i, response in enumerate(responses, start=2):
+                response.raise_for_status()
+                if not HTMLParser(response.text).css_first(ROW_SELECTOR):
+                    logger.warning(f"[Pokebase] HTTP page {i} has no rows")
+                    return None
+                pages.append(response.text)
+
+            return pages
 
-        all_pages_html: List[str] = []
+    # -------------------------------------------------
+    # Playwright + pagination
+    # -------------------------------------------------
+    def _fetch_playwright(self) -> Optional[List[str]]:
+        """Fetch toàn bộ pages bằng Playwright, trả về list HTML theo thứ tự page."""
 
         for attempt in range(1, self.retries + 1):
             logger.info(f"[Pokebase] Playwright fetch attempt {attempt}/{self.retries}")
 
+            all_pages_html: List[str] = []
+
             try:
                 with sync_playwright() as p:
                     browser = p.chromium.launch(headless=self.headless)
                     context = browser.new_context(user_agent=self.user_agent)
                     page = context.new_page()
+                    page.route("**/*", block_heavy_resources)
 
                     # Load page 1
                     logger.info("[Pokebase] Loading page 1")
-                    page.goto(self.url, timeout=self.pw_timeout)
+                    page.goto(self.url, timeout=self.pw_timeout, wait_until="domcontentloaded")
 
                     try:
-                        page.wait_for_load_state("networkidle", timeout=self.pw_timeout)
+                        page.wait_for_selector(ROW_SELECTOR, timeout=self.row_timeout)
                     except PlaywrightTimeoutError:
-                        logger.warning("[Pokebase] networkidle timeout at page 1")
-
-                    time.sleep(self.wait_after_idle)
+                        logger.warning("[Pokebase] rows not rendered at page 1")
 
                     html = page.content()
-                    soup = BeautifulSoup(html, "lxml")
 
-                    max_page = self._detect_total_pages(soup)
+                    max_page = self._detect_total_pages(HTMLParser(html))
                     logger.info(f"[Pokebase] Detected total pages = {max_page}")
 
                     all_pages_html.append(html)
@@ -68,13 +152,11 @@ class PokebaseScraper(BaseScraper):
                         page_url = f"{self.url}?page={i}"
                         logger.info(f"[Pokebase] Fetching page {i}/{max_page} → {page_url}")
 
-                        page.goto(page_url, timeout=self.pw_timeout)
+                        page.goto(page_url, timeout=self.pw_timeout, wait_until="domcontentloaded")
                         try:
-                            page.wait_for_load_state("networkidle", timeout=self.pw_timeout)
+                            page.wait_for_selector(ROW_SELECTOR, timeout=self.row_timeout)
                         except PlaywrightTimeoutError:
-                            logger.warning(f"[Pokebase] networkidle timeout at page {i}")
-
-                        time.sleep(self.wait_after_idle)
+                            logger.warning(f"[Pokebase] rows not rendered at page {i}")
 
                         html_i = page.content()
                         all_pages_html.append(html_i)
@@ -85,12 +167,7 @@ class PokebaseScraper(BaseScraper):
                     context.close()
                     browser.close()
 
-                # Save snapshot
-                save_html("\n<!--PAGE_BREAK-->\n".join(all_pages_html), self.raw_html_path)
-
-                # Combine
-                merged_html = "\n".join(all_pages_html)
-                return BeautifulSoup(merged_html, "lxml")
+                return all_pages_html
 
             except Exception as e:
                 logger.error(f"[Pokebase] Playwright error: {e}")
@@ -102,12 +179,12 @@ class PokebaseScraper(BaseScraper):
     # -------------------------------------------------
     # Detect total pages
     # -------------------------------------------------
-    def _detect_total_pages(self, soup: BeautifulSoup) -> int:
-        bar = soup.select_one("div.flex.items-center.gap-1")
+    def _detect_total_pages(self, tree: HTMLParser) -> int:
+        bar = tree.css_first("div.flex.items-center.gap-1")
         if not bar:
             return 1
 
-        text = bar.get_text(" ", strip=True)
+        text = bar.text(separator=" ", strip=True)
         parts = text.split()
 
         if "of" in parts:
@@ -120,45 +197,43 @@ class PokebaseScraper(BaseScraper):
         return 1
 
     # -------------------------------------------------
-    # Parse entire merged soup
+    # Parse từng page HTML (mỗi page parse đúng 1 lần)
     # -------------------------------------------------
-    def parse(self, soup: BeautifulSoup) -> dict[str, Any]:
+    def parse(self, pages: List[str]) -> dict[str, Any]:
         results: List[Dict[str, Any]] = []
 
-        # Count how many page breaks → useful for progress
-        page_parts = soup.decode().split("<!--PAGE_BREAK-->")
-        logger.info(f"[Pokebase] Begin parse: detected {len(page_parts)} pages merged")
+        logger.info(f"[Pokebase] Begin parse: {len(pages)} pages")
 
         # Parse each page separately (so log rõ page mấy)
-        for page_idx, page_html in enumerate(page_parts, start=1):
-            page_soup = BeautifulSoup(page_html, "lxml")
+        for page_idx, page_html in enumerate(pages, start=1):
+            tree = HTMLParser(page_html)
 
-            rows = page_soup.select("div.table-row-group > div.table-row")
+            rows = tree.css(ROW_SELECTOR)
             logger.info(f"[Pokebase] Parsing page {page_idx}: found {len(rows)} rows")
 
             for row in rows:
                 try:
-                    cells = row.select("span.table-cell")
+                    cells = row.css("span.table-cell")
                     if not cells:
                         continue
 
                     first = cells[0]
-                    a = first.select_one("a")
+                    a = first.css_first("a")
                     if not a:
                         continue
 
                     name_el = (
-                            a.select_one("span.font-semibold div.truncate")
-                            or a.select_one("span.font-semibold")
+                            a.css_first("span.font-semibold div.truncate")
+                            or a.css_first("span.font-semibold")
                     )
-                    name = name_el.get_text(strip=True) if name_el else None
+                    name = name_el.text(strip=True) if name_el else None
 
-                    url = a.get("href")
+                    url = a.attributes.get("href")
                     if url and not url.startswith("http"):
                         url = "https://pokebase.app" + url
 
-                    img_el = a.select_one("img")
-                    img_raw = img_el.get("src") if img_el else None
+                    img_el = a.css_first("img")
+                    img_raw = img_el.attributes.get("src") if img_el else None
                     if img_raw:
                         img = img_raw.split("?", 1)[0]
                     else:
@@ -166,7 +241,7 @@ class PokebaseScraper(BaseScraper):
 
                     def get(i):
                         if i < len(cells):
-                            return cells[i].get_text(strip=True)
+                            return cells[i].text(strip=True)
                         return None
 
                     results.append(
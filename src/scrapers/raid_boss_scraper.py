@@ -8,7 +8,7 @@ from src.utils import parse_cp_range
 from .base_scraper import BaseScraper
 
 
-class RaidBossScraper(BaseScraper):
+class RaidBossScraper(BaseScraper[BeautifulSoup]):
     def __init__(self, url: str, file_name: str, scraper_settings: dict[str, Any]):
         super().__init__(url, file_name, scraper_settings)
 
@@ -12,7 +12,7 @@ from src.utils import save_html
 logger = logging.getLogger(__name__)
 
 
-class RaidNowScraper(BaseScraper):
+class RaidNowScraper(BaseScraper[BeautifulSoup]):
     """Scraper lấy dữ liệu RaidNow (LeekDuck) bằng Playwright."""
 
     def __init__(self, url: str, file_name: str, scraper_settings: dict[str, Any]):
@@ -63,7 +63,8 @@ class RaidNowScraper(BaseScraper):
                     continue
 
                 # Save raw HTML
-                save_html(html, self.raw_html_path)
+                if self.save_raw_html:
+                    save_html(html, self.raw_html_path)
 
                 return BeautifulSoup(html, "lxml")
 
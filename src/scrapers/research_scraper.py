@@ -31,7 +31,7 @@ def convert_research_json(old_json: dict) -> dict:
 
     return {"results": result}
 
-class ResearchScraper(BaseScraper):
+class ResearchScraper(BaseScraper[BeautifulSoup]):
     def __init__(self, url: str, file_name: str, scraper_settings: dict[str, Any]):
         super().__init__(url, file_name, scraper_settings)
 
@@ -27,7 +27,7 @@ def convert_rocket_json(old_json: dict) -> dict:
 
     return {"results": result}
 
-class RocketLineupScraper(BaseScraper):
+class RocketLineupScraper(BaseScraper[BeautifulSoup]):
     def __init__(self, url: str, file_name: str, scraper_settings: dict[str, Any]):
         super().__init__(url, file_name, scraper_settings)
 
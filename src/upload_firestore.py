@@ -1,15 +1,77 @@
 # src/upload_firestore.py
-import json
+import mmap
+import multiprocessing
 import os
 import sys
-import time
-from typing import Any, List, Dict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from contextlib import nullcontext
+from functools import partial
+from itertools import chain
+from typing import Any, Callable, List, Dict, Optional, Tuple
 
 import firebase_admin
+import ijson
+import orjson
+import xxhash
 from firebase_admin import credentials, firestore
+from google.cloud.firestore_v1.bulk_writer import (
+    BulkRetry,
+    BulkWriteFailure,
+    BulkWriter,
+    BulkWriterOptions,
+)
+from google.cloud.firestore_v1.collection import CollectionReference
+from google.cloud.firestore_v1.document import DocumentReference
+from google.cloud.firestore_v1.types.write import WriteResult
+from google.rpc import code_pb2
 
 RETRY_ATTEMPTS = 3
-RETRY_BACKOFF = 2  # seconds
+# Transient gRPC statuses; anything else (INVALID_ARGUMENT, PERMISSION_DENIED, ...) fails fast
+RETRYABLE_CODES = frozenset({
+    code_pb2.ABORTED,
+    code_pb2.DEADLINE_EXCEEDED,
+    code_pb2.INTERNAL,
+    code_pb2.RESOURCE_EXHAUSTED,
+    code_pb2.UNAVAILABLE,
+})
+LOAD_WORKERS = 16  # threads reading + hashing files (I/O bound)
+PARSE_WORKERS = os.cpu_count()  # processes decoding + normalizing large JSON files (CPU bound)
+STREAM_MIN_BYTES = 1024 * 1024  # files this large are normalized with ijson
+PRESCAN_BYTES = 256  # head bytes sniffed to tell case-2 dicts from list / "results" docs
+# Low-cardinality string fields repeated across many results items
+INTERN_FIELDS = ("category", "type", "stage", "form")
+# Firestore rejects documents over 1 MiB; keep headroom for protobuf overhead
+MAX_DOC_BYTES = 900_000
+MANIFEST_NAME = ".upload_manifest.json"  # doc_id -> content hash of the last successful upload
+
+# C (yajl2) SAX backend when available, else whatever ijson picks
+try:
+    _ijson = ijson.get_backend("yajl2_c")
+except ImportError:
+    _ijson = ijson
+
+# Long-lived client: the gRPC channel + OAuth token are reused across calls
+_DB: Optional[firestore.Client] = None
+
+
+def load_manifest(path: str) -> Dict[str, str]:
+    """Load the local upload manifest ({} if missing or unreadable)."""
+    try:
+        with open(path, "rb") as fh:
+            return orjson.loads(fh.read())
+    except FileNotFoundError:
+        return {}
+    except orjson.JSONDecodeError as e:
+        print(f"[WARN] Ignoring corrupt manifest {path}: {e}", file=sys.stderr)
+        return {}
+
+
+def save_manifest(path: str, manifest: Dict[str, str]):
+    """Write the manifest atomically (tmp file + os.replace)."""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as fh:
+        fh.write(orjson.dumps(manifest, option=orjson.OPT_SORT_KEYS))
+    os.replace(tmp_path, path)
 
 
 def get_repo_root() -> str:
@@ -19,13 +81,24 @@ def get_repo_root() -> str:
 
 
 def init_firebase(service_account_path: str):
-    """Initialize Firebase with serviceAccount.json."""
+    """Initialize Firebase with serviceAccount.json (no-op if already initialized)."""
+    if firebase_admin._apps:
+        return  # re-import / warm start
     if not os.path.isfile(service_account_path):
         raise FileNotFoundError(f"Service account not found: {service_account_path}")
     cred = credentials.Certificate(service_account_path)
     firebase_admin.initialize_app(cred)
 
 
+def get_db(service_account_path: str) -> firestore.Client:
+    """Return the process-wide Firestore client, initializing Firebase once."""
+    global _DB
+    if _DB is None:
+        init_firebase(service_account_path)
+        _DB = firestore.client()
+    return _DB
+
+
 def find_json_dirs(repo_root: str) -> List[str]:
     """Look for json directories."""
     candidates = [
@@ -35,26 +108,305 @@ def find_json_dirs(repo_root: str) -> List[str]:
     return [p for p in candidates if os.path.isdir(p)]
 
 
-def gather_json_files(dirs: List[str]) -> List[str]:
-    """Collect all JSON files."""
+def gather_json_files(dirs: List[str]) -> List[Tuple[str, str]]:
+    """Collect all JSON files as ``(path, doc_id)`` pairs (doc_id = name without .json)."""
     files = []
     for d in dirs:
-        for fn in os.listdir(d):
-            if fn.lower().endswith(".json"):
-                files.append(os.path.join(d, fn))
+        # DirEntry carries .path and a cached is_file(), no extra join/stat per file.
+        # Scrapers always write lowercase ".json", so the suffix is exactly 5 chars.
+        with os.scandir(d) as entries:
+            files.extend(
+                (e.path, e.name[:-5]) for e in entries if e.is_file() and e.name.endswith(".json")
+            )
     return files
 
 
 def safe_load_json(path: str) -> Any:
-    with open(path, "r", encoding="utf-8") as fh:
-        return json.load(fh)
+    """Decode a JSON file straight from an mmap (no read() copy, no text decode)."""
+    with open(path, "rb") as fh:
+        with mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            # orjson needs a buffer object; release the view before the mmap closes
+            with memoryview(mm) as view:
+                return orjson.loads(view)
+
+
+def file_content_hash(path: str) -> str:
+    """xxh3_64 of the raw file bytes (hashed straight from an mmap)."""
+    with open(path, "rb") as fh:
+        if os.fstat(fh.fileno()).st_size == 0:
+            return xxhash.xxh3_64_hexdigest(b"")
+        with mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return xxhash.xxh3_64_hexdigest(mm)
+
+
+def _flatten_category(category: str, items: Any) -> List[Any]:
+    """Return one category's items tagged with "category".
+
+    Dict items are tagged in place (not copied): they come straight from the
+    JSON decoder and are never reused after being shipped to Firestore. A
+    list of only dicts (the usual shape) is returned as-is, without a new list.
+    """
+    if not isinstance(items, list):
+        return [{"value": items, "category": category}]
+    all_dicts = True
+    for it in items:
+        if type(it) is dict:
+            it["category"] = category
+        else:
+            all_dicts = False
+    if all_dicts:
+        return items
+    return [it if type(it) is dict else {"value": it, "category": category} for it in items]
+
+
+def _normalize_dict(data: Dict[str, Any], doc_id: str) -> Dict[str, Any]:
+    # Case 1: already normalized. An empty dict is BaseScraper.run's failed-fetch
+    # placeholder and is stored as-is too.
+    results = data.get("results")
+    if type(results) is list or not data:
+        return data
+
+    # Case 2: dict of category -> list of items
+    return {
+        "results": list(
+            chain.from_iterable(
+                _flatten_category(category, items) for category, items in data.items()
+            )
+        )
+    }
+
+
+def _normalize_list(data: List[Any], doc_id: str) -> Dict[str, Any]:
+    # Case 3: top-level list (Firestore documents must be maps)
+    return {"results": data}
+
+
+def _normalize_scalar(data: Any, doc_id: str) -> Dict[str, Any]:
+    print(f"[WARN] {doc_id}: unexpected top-level {type(data).__name__}, wrapping", file=sys.stderr)
+    return {"results": [{"value": data}]}
+
+
+# JSON decoders only ever produce exact dict / list, so an identity lookup on type() is enough
+_NORMALIZERS: Dict[type, Callable[[Any, str], Dict[str, Any]]] = {
+    dict: _normalize_dict,
+    list: _normalize_list,
+}
+
+
+def normalize_json(data: Any, doc_id: str) -> Dict[str, Any]:
+    """Shape any scraped JSON into a Firestore-storable ``{"results": [...]}`` doc.
+
+    1. ``{"results": [...]}`` (scraper output) and the ``{}`` failed-fetch
+       placeholder are returned as-is.
+    2. Any other dict is treated as ``{category: items}`` (e.g. events.json
+       after the archiver) and flattened, tagging each item with "category".
+       This changes the stored scraped_data shape for such files: readers get
+       ``results[*].category`` instead of one top-level field per category.
+    3. A top-level list is wrapped under "results".
+
+    ``data`` must come straight from the decoder: the result always belongs
+    to the caller, who may mutate it (case 1 hands back ``data`` itself rather
+    than a copy, and case 2 tags the dict items of ``data`` with "category").
+    """
+    return _NORMALIZERS.get(type(data), _normalize_scalar)(data, doc_id)
+
+
+def normalize_json_streaming(path: str, doc_id: str) -> Dict[str, Any]:
+    """Stream a ``{category: items}`` file with ijson, one category at a time.
+
+    Only the current category's items and the flattened results are held in
+    memory, never the whole decoded document. Files that turn out not to be
+    case 2 fall back to ``normalize_json`` on a full load.
+    """
+    all_items: List[Any] = []
+    with open(path, "rb") as fh:
+        seen_any = False
+        for category, items in _ijson.kvitems(fh, "", use_float=True):
+            if category == "results" and isinstance(items, list):
+                break  # case 1 (already normalized) → full load below
+            seen_any = True
+            all_items.extend(_flatten_category(category, items))
+        else:
+            if seen_any:
+                return {"results": all_items}
+
+    # Top-level list / empty dict / "results" doc: not worth streaming
+    return normalize_json(safe_load_json(path), doc_id)
+
+
+def is_category_dict(path: str) -> bool:
+    """Peek the first PRESCAN_BYTES: True for a top-level object not opening with "results".
+
+    A ``[`` (case 3) or ``{"results"`` (case 1) document is stored as-is, so
+    streaming it would only add overhead over a plain orjson load.
+    """
+    with open(path, "rb") as fh:
+        head = fh.read(PRESCAN_BYTES).lstrip()
+    if not head.startswith(b"{"):
+        return False
+    return not head[1:].lstrip().startswith(b'"results"')
+
+
+def process_one(path: str, doc_id: str) -> Dict[str, Any]:
+    """Worker: load + normalize one JSON file (runs on the parse process pool)."""
+    if os.path.getsize(path) >= STREAM_MIN_BYTES and is_category_dict(path):
+        return normalize_json_streaming(path, doc_id)
+    return normalize_json(safe_load_json(path), doc_id)
+
+
+def stored_upload_state(
+    db: firestore.Client, collection: CollectionReference, doc_ids: List[str]
+) -> Dict[str, Dict[str, Any]]:
+    """Fetch ``_content_hash`` / ``_parts`` for many documents in one BatchGetDocuments stream.
+
+    Only those fields are projected; missing documents are simply absent.
+    """
+    if not doc_ids:
+        return {}
+    refs = [collection.document(doc_id) for doc_id in doc_ids]
+    return {
+        snapshot.id: snapshot.to_dict() or {}
+        for snapshot in db.get_all(refs, field_paths=["_content_hash", "_parts"])
+        if snapshot.exists
+    }
+
+
+def intern_result_strings(data: Dict[str, Any]):
+    """Dedupe repeated INTERN_FIELDS values in ``data["results"]`` in place.
 
+    Equal strings then share one object, which lowers peak memory for large
+    lists and the number of distinct objects the encoder walks.
+    """
+    results = data.get("results")
+    if not isinstance(results, list):
+        return
+    cache: Dict[str, str] = {}
+    for item in results:
+        if not isinstance(item, dict):
+            continue
+        for field in INTERN_FIELDS:
+            v = item.get(field)
+            if isinstance(v, str):
+                item[field] = cache.setdefault(v, v)
+
+
+def firestore_size(value: Any) -> int:
+    """Firestore storage size of a decoded JSON value.
+
+    Strings count UTF-8 bytes + 1, numbers (and timestamps / sentinels) 8,
+    bool and null 1, and each map field its name bytes + 1 on top of the value
+    (https://firebase.google.com/docs/firestore/storage-size).
+    """
+    t = type(value)
+    if t is str:
+        return (len(value) if value.isascii() else len(value.encode("utf-8"))) + 1
+    if t is dict:
+        return sum(len(k.encode("utf-8")) + 1 + firestore_size(v) for k, v in value.items())
+    if t is list:
+        return sum(map(firestore_size, value))
+    if value is None or t is bool:
+        return 1
+    return 8
+
+
+def document_size(collection: CollectionReference, doc_id: str, fields: Dict[str, Any]) -> int:
+    """Firestore size of a whole document: name + fields + 32 bytes overhead."""
+    name_size = len(collection.id.encode("utf-8")) + 1 + len(doc_id.encode("utf-8")) + 1 + 16
+    return name_size + firestore_size(fields) + 32
+
+
+def shard_results(results: List[Any], max_bytes: int) -> List[List[Any]]:
+    """Split ``results`` greedily into chunks whose Firestore size stays under ``max_bytes``."""
+    shards: List[List[Any]] = [[]]
+    size = 0
+    for item in results:
+        item_size = firestore_size(item)
+        if shards[-1] and size + item_size > max_bytes:
+            shards.append([])
+            size = 0
+        shards[-1].append(item)
+        size += item_size
+    return shards
+
+
+def upload_document(
+    bulk_writer: BulkWriter,
+    collection: CollectionReference,
+    doc_id: str,
+    data: Dict[str, Any],
+    content_hash: Optional[str] = None,
+    prev_parts: Optional[int] = 0,
+) -> List[str]:
+    """Queue raw scraped data + _updated_at (and _content_hash) on the bulk writer.
 
-def upload_document(db: firestore.Client, collection: str, doc_id: str, data: Dict[str, Any]):
-    """Upload raw scraped data + _updated_at timestamp."""
-    payload = dict(data)
-    payload["_updated_at"] = firestore.SERVER_TIMESTAMP
-    db.collection(collection).document(doc_id).set(payload)
+    ``data`` is owned by the uploader (see normalize_json), so the extra
+    fields are added in place instead of copying the payload.
+
+    Payloads over MAX_DOC_BYTES (Firestore storage size) are sharded into
+    ``<doc_id>_part<k>`` documents plus an index doc ``<doc_id>`` holding the
+    remaining top-level fields and ``_parts``. Parts left over from a previous
+    upload (``prev_parts``, None if unknown) are deleted. Returns the ids of
+    the documents queued.
+    """
+    intern_result_strings(data)
+    if content_hash is not None:
+        data["_content_hash"] = content_hash
+    data["_updated_at"] = firestore.SERVER_TIMESTAMP
+
+    # Dict -> Value proto encoding is left to the client: BulkWriter only takes
+    # plain dicts, and raw Commit RPCs would lose its batching, rate limiting,
+    # retries and per-document result callbacks.
+    # Always a full set(): Firestore field paths can't address array elements
+    # ("results.3" would create a map key), so results can't be patched per
+    # index; unchanged files are already skipped via _content_hash instead.
+    results = data.get("results")
+    # orjson length is a cheap upper bound first: a JSON value is at least a
+    # quarter of its Firestore size (e.g. "1," vs 8 bytes)
+    if (
+        not isinstance(results, list)
+        or 4 * len(orjson.dumps(data, default=lambda _: 0)) + 1024 <= MAX_DOC_BYTES
+        or document_size(collection, doc_id, data) <= MAX_DOC_BYTES
+    ):
+        bulk_writer.set(collection.document(doc_id), data)
+        return [doc_id] + delete_stale_parts(bulk_writer, collection, doc_id, 0, prev_parts)
+
+    # Budget per part = limit minus the part's own envelope fields
+    envelope = {"results": [], "_parent": doc_id, "_part": 0, "_updated_at": firestore.SERVER_TIMESTAMP}
+    budget = MAX_DOC_BYTES - document_size(collection, f"{doc_id}_part{len(results)}", envelope)
+    shards = shard_results(results, budget)
+    print(f"[upload_firestore] {doc_id} exceeds {MAX_DOC_BYTES} bytes, sharding into {len(shards)} parts")
+    part_ids = [f"{doc_id}_part{k}" for k in range(len(shards))]
+    for k, (part_id, shard) in enumerate(zip(part_ids, shards)):
+        bulk_writer.set(
+            collection.document(part_id),
+            {"results": shard, "_parent": doc_id, "_part": k, "_updated_at": firestore.SERVER_TIMESTAMP},
+        )
+
+    del data["results"]
+    data["_parts"] = len(shards)
+    bulk_writer.set(collection.document(doc_id), data)
+    stale_ids = delete_stale_parts(bulk_writer, collection, doc_id, len(shards), prev_parts)
+    return part_ids + [doc_id] + stale_ids
+
+
+def delete_stale_parts(
+    bulk_writer: BulkWriter,
+    collection: CollectionReference,
+    doc_id: str,
+    parts: int,
+    prev_parts: Optional[int],
+) -> List[str]:
+    """Delete ``<doc_id>_part<k>`` for ``parts <= k < prev_parts``; returns the ids queued."""
+    if prev_parts is None:
+        print(
+            f"[WARN] {doc_id}: previous part count unknown, stale parts not cleaned (retried next run)",
+            file=sys.stderr,
+        )
+        return []
+    stale_ids = [f"{doc_id}_part{k}" for k in range(parts, prev_parts)]
+    for part_id in stale_ids:
+        bulk_writer.delete(collection.document(part_id))
+    return stale_ids
 
 
 def main():
@@ -65,13 +417,11 @@ def main():
     print(f"[upload_firestore] Using {service_account_path}")
 
     try:
-        init_firebase(service_account_path)
+        db = get_db(service_account_path)
     except Exception as e:
         print(f"[ERROR] Firebase init failed: {e}", file=sys.stderr)
         raise
 
-    db = firestore.client()
-
     json_dirs = find_json_dirs(repo_root)
     if not json_dirs:
         print("[upload_firestore] ERROR: No json directories found.")
@@ -84,33 +434,172 @@ def main():
 
     print(f"[upload_firestore] Found {len(files)} JSON files.")
 
-    any_err = False
+    manifest_path = os.path.join(repo_root, MANIFEST_NAME)
+    manifest = load_manifest(manifest_path)
+
+    uploaded_docs: List[str] = []
+    failed_docs: List[str] = []
 
-    for path in files:
-        filename = os.path.basename(path)
-        doc_id = filename[:-5]  # strip .json
+    def on_write_result(reference: DocumentReference, _: WriteResult, __: BulkWriter):
+        print(f"[upload_firestore] Uploaded → scraped_data/{reference.id}")
+        uploaded_docs.append(reference.id)
 
-        print(f"[upload_firestore] Uploading {filename} → scraped_data/{doc_id}")
+    def on_write_error(error: BulkWriteFailure, _: BulkWriter) -> bool:
+        """Retry transient errors (with BulkWriter's own backoff) until RETRY_ATTEMPTS."""
+        doc_id = error.operation.reference.id
+        attempt = error.attempts + 1  # BulkWriteFailure.attempts is 0 on the first failure
+        code = code_pb2.Code.Name(error.code) if error.code in code_pb2.Code.values() else error.code
+        print(
+            f"[WARN] attempt {attempt}/{RETRY_ATTEMPTS} failed for {doc_id} ({code}): {error.message}",
+            file=sys.stderr,
+        )
+        if error.code in RETRYABLE_CODES and attempt < RETRY_ATTEMPTS:
+            return True
+        failed_docs.append(doc_id)
+        return False
 
+    # Failed writes are re-queued with a growing delay while the rest of the
+    # batch keeps flowing, so one slow retry never blocks the other documents.
+    bulk_writer = db.bulk_writer(options=BulkWriterOptions(retry=BulkRetry.exponential))
+    bulk_writer.on_write_result(on_write_result)
+    bulk_writer.on_write_error(on_write_error)
+    col = db.collection("scraped_data")
+
+    any_err = False
+    queued = 0
+    skipped = 0
+    # doc_id -> (content hash, queued document ids), recorded once all are acked
+    pending: Dict[str, Tuple[str, List[str]]] = {}
+    # Files uploaded without knowing their previous _parts: stale parts may
+    # remain, so they stay out of the manifest and get re-checked next run
+    parts_unknown: set = set()
+
+    # 1. Hash every file on a thread pool (disk bound)
+    with ThreadPoolExecutor(max_workers=LOAD_WORKERS) as pool:
+        hash_futures = {pool.submit(file_content_hash, path): (path, doc_id) for path, doc_id in files}
+
+    candidates: List[Tuple[str, str, str]] = []  # (path, doc_id, content_hash)
+    for future, (path, doc_id) in hash_futures.items():
         try:
-            raw = safe_load_json(path)
+            content_hash = future.result()
         except Exception as e:
-            print(f"[ERROR] Failed to load {filename}: {e}", file=sys.stderr)
+            print(f"[ERROR] Failed to load {doc_id}.json: {e}", file=sys.stderr)
             any_err = True
             continue
+        if manifest.get(doc_id) == content_hash:
+            print(f"[upload_firestore] Unchanged, skipping {doc_id}.json")
+            skipped += 1
+        else:
+            candidates.append((path, doc_id, content_hash))
+
+    # 2. Files the local manifest can't vouch for: one batched read of the
+    #    stored hashes (+ part counts) instead of a round-trip per document
+    try:
+        stored: Optional[Dict[str, Dict[str, Any]]] = stored_upload_state(
+            db, col, [doc_id for _, doc_id, _ in candidates]
+        )
+    except Exception as e:
+        print(f"[WARN] Could not read stored hashes, uploading all: {e}", file=sys.stderr)
+        stored = None
+
+    changed: List[Tuple[str, str, str, Optional[int]]] = []  # + previous _parts (None = unknown)
+    for path, doc_id, content_hash in candidates:
+        state = stored.get(doc_id, {}) if stored is not None else {}
+        # A sharded index doc can be acked while one of its parts failed, so its
+        # stored hash doesn't prove the upload is complete: only the manifest
+        # (recorded once every part is acked) may skip those
+        if not state.get("_parts") and state.get("_content_hash") == content_hash:
+            print(f"[upload_firestore] Unchanged, skipping {doc_id}.json")
+            manifest[doc_id] = content_hash
+            skipped += 1
+        else:
+            prev_parts = (state.get("_parts") or 0) if stored is not None else None
+            changed.append((path, doc_id, content_hash, prev_parts))
+
+    # 3. Parse + normalize. Files under STREAM_MIN_BYTES decode in well under
+    #    a millisecond, far less than a spawned worker's interpreter start and
+    #    imports, so they are decoded inline; only large files go to a process
+    #    pool, and the pool is created only when there is at least one. The
+    #    small files are decoded while the workers start up. BulkWriter itself
+    #    is not thread-safe, so documents are queued from this thread as each
+    #    file is ready. Workers start when gRPC and BulkWriter threads are
+    #    already running, so they are spawned rather than forked (fork + live
+    #    gRPC threads can deadlock).
+    small, large = [], []
+    for entry in changed:
+        (large if os.path.getsize(entry[0]) >= STREAM_MIN_BYTES else small).append(entry)
+
+    with (
+        ProcessPoolExecutor(
+            max_workers=min(PARSE_WORKERS, len(large)),
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+        if large
+        else nullcontext()
+    ) as parse_pool:
+        futures = {
+            parse_pool.submit(process_one, path, doc_id): (doc_id, content_hash, prev_parts)
+            for path, doc_id, content_hash, prev_parts in large
+        }
+
+        def loaded():
+            for path, doc_id, content_hash, prev_parts in small:
+                yield (doc_id, content_hash, prev_parts), partial(process_one, path, doc_id)
+            for future in as_completed(futures):
+                yield futures[future], future.result
 
-        # Upload raw JSON + timestamp
-        for attempt in range(1, RETRY_ATTEMPTS + 1):
+        for (doc_id, content_hash, prev_parts), load in loaded():
+            filename = f"{doc_id}.json"
+
+            try:
+                normalized = load()
+            except Exception as e:
+                print(f"[ERROR] Failed to load {filename}: {e}", file=sys.stderr)
+                any_err = True
+                continue
+
+            print(f"[upload_firestore] Queueing {filename} → scraped_data/{doc_id}")
+
+            # Upload normalized JSON + timestamp
             try:
-                upload_document(db, "scraped_data", doc_id, raw)
-                print(f"[upload_firestore] Uploaded → scraped_data/{doc_id}")
-                break
+                queued_ids = upload_document(
+                    bulk_writer, col, doc_id, normalized, content_hash, prev_parts
+                )
+                pending[doc_id] = (content_hash, queued_ids)
+                if prev_parts is None:
+                    parts_unknown.add(doc_id)
+                queued += len(queued_ids)
             except Exception as e:
-                print(f"[WARN] attempt {attempt} failed for {doc_id}: {e}", file=sys.stderr)
-                if attempt == RETRY_ATTEMPTS:
-                    any_err = True
-                else:
-                    time.sleep(RETRY_BACKOFF ** (attempt - 1))
+                print(f"[ERROR] Failed to queue {doc_id}: {e}", file=sys.stderr)
+                any_err = True
+
+    # Block until every queued write is acked (or has exhausted its retries)
+    bulk_writer.close()
+
+    # Only remember files whose every document (all shards included) was acked
+    written = set(uploaded_docs)
+    for doc_id, (content_hash, queued_ids) in pending.items():
+        if doc_id not in parts_unknown and written.issuperset(queued_ids):
+            manifest[doc_id] = content_hash
+    save_manifest(manifest_path, manifest)
+
+    print(
+        f"[upload_firestore] {len(uploaded_docs)}/{queued} documents written, "
+        f"{skipped} unchanged files skipped."
+    )
+
+    if failed_docs:
+        print(f"[ERROR] Upload failed for: {', '.join(failed_docs)}", file=sys.stderr)
+        any_err = True
+
+    # A batch whose commit() raised never reaches either callback (BulkWriter
+    # swallows the exception in its executor future), so anything queued but
+    # neither acked nor failed is a failure too
+    settled = written.union(failed_docs)
+    unacked = [ref_id for _, queued_ids in pending.values() for ref_id in queued_ids if ref_id not in settled]
+    if unacked:
+        print(f"[ERROR] No write result for: {', '.join(unacked)}", file=sys.stderr)
+        any_err = True
 
     if any_err:
         raise RuntimeError("Some uploads failed. Check logs.")
@@ -6,6 +6,18 @@ from typing import Any, Optional, Union
 from bs4.element import Tag
 
 
+# Resource types the scrapers never read; aborting them saves bandwidth per page
+BLOCKED_RESOURCE_TYPES = frozenset({"image", "font", "media", "stylesheet"})
+
+
+def block_heavy_resources(route: Any):
+    """Playwright (sync) route handler that aborts BLOCKED_RESOURCE_TYPES requests."""
+    if route.request.resource_type in BLOCKED_RESOURCE_TYPES:
+        route.abort()
+    else:
+        route.continue_()
+
+
 def save_html(content: str, path: str):
     """Utility function to save HTML content to a specified path."""
     if not os.getenv("CI"):